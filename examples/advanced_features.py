@@ -81,19 +81,16 @@ def demonstrate_advanced_features():
         smu.enable_channel(1)
         print("   Channel 1: Configured for 1.2V precision sourcing")
         
-        # Take a high-precision measurement
-        voltage, current = smu.measure_voltage_and_current(1)
-        print(f"   Measured: {voltage:.6f}V, {current*1000:.3f}mA")
-        
         # Configure channel 2 for current sourcing  
         smu.set_mode(2, "FIMV")  # Force current, measure voltage
         smu.set_current(2, 0.01)  # Set 10mA output
         smu.enable_channel(2)
         print("   Channel 2: Configured for 10mA current sourcing")
         
-        # Take measurement on channel 2
-        voltage, current = smu.measure_voltage_and_current(2)
-        print(f"   Measured: {voltage:.3f}V, {current*1000:.3f}mA")
+        # Measure both channels in a single round trip
+        (v1, i1), (v2, i2) = smu.measure_channels([1, 2])
+        print(f"   Channel 1 measured: {v1:.6f}V, {i1*1000:.3f}mA")
+        print(f"   Channel 2 measured: {v2:.3f}V, {i2*1000:.3f}mA")
         
         # 5. Safety demonstration
         print("\n5. Safety features active:")
@@ -1,9 +1,15 @@
 from minismu_py import SMU, ConnectionType
 import time
+import argparse
 
 def main():
+    parser = argparse.ArgumentParser(description='Basic miniSMU measurement example')
+    parser.add_argument('--port', '-p', type=str, default='COM50',
+                        help='COM port for miniSMU connection (default: COM50)')
+    args = parser.parse_args()
+
     # Create SMU instance with USB connection
-    with SMU(ConnectionType.USB, port="COM50") as smu:
+    with SMU(ConnectionType.USB, port=args.port) as smu:
         # Print device information
         print("Device Info:", smu.get_identity())
         
@@ -2,8 +2,11 @@ from minismu_py import SMU, ConnectionType, SMUException
 import time
 import csv
 import argparse
+import os
+from array import array
 from typing import Optional
 from tqdm import tqdm
+import numpy as np
 
 class SMUUSBManager:
     """Helper class to manage USB connection to SMU"""
@@ -22,31 +25,109 @@ class SMUUSBManager:
             print(f"Failed to connect to SMU: {e}")
             raise
 
-def current_sweep_example(smu: SMU, currents: list, channel: int = 1):
-    """Perform a current sweep and measure voltage"""
+def settle(seconds: float):
+    """
+    Wait for the output to settle, without time.sleep() overshoot
+
+    time.sleep() can overrun by a whole timer tick (~15 ms on Windows), which
+    adds up over a sweep. Sleep for all but the last 2 ms and busy-wait the
+    remainder against perf_counter; short waits are spun entirely.
+    """
+    deadline = time.perf_counter() + seconds
+    if seconds > 0.005:
+        time.sleep(seconds - 0.002)
+    while time.perf_counter() < deadline:
+        pass
+
+
+class ParquetColumnWriter:
+    """
+    Collects sweep rows column-wise and writes them as a Parquet file
+
+    Drop-in for csv.writer inside current_sweep_example: each writerow()
+    appends to three contiguous double arrays, and save() hands them to
+    pyarrow in one go. Requires the optional pyarrow package.
+    """
+    COLUMNS = ('target_current', 'measured_current', 'measured_voltage')
+
+    def __init__(self):
+        self.columns = tuple(array('d') for _ in self.COLUMNS)
+
+    def writerow(self, row):
+        for column, value in zip(self.columns, row):
+            column.append(value)
+
+    def save(self, filename: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({name: np.frombuffer(column, dtype=np.float64)
+                          for name, column in zip(self.COLUMNS, self.columns)})
+        pq.write_table(table, filename)
+
+
+def pyarrow_available() -> bool:
+    """Check whether Parquet output is possible"""
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def current_sweep_example(smu: SMU, currents: list, writer, channel: int = 1,
+                          settle_time: float = 0.2) -> int:
+    """
+    Perform a current sweep and measure voltage
+
+    The onboard sweep engine (run_iv_sweep) only sweeps voltage, so a
+    current sweep has to be stepped from the host. Pass settle_time=0 to
+    skip the host-side delay and rely on the device's own settling.
+
+    Each point is written to `writer` (a csv.writer or ParquetColumnWriter)
+    as soon as it is measured as (target_current, measured_current,
+    measured_voltage).
+
+    Returns:
+        Number of points measured
+    """
     try:
         # Configure channel
         smu.set_mode(channel, "FIMV")  # Force Current, Measure Voltage mode
         # smu.set_current_range(channel, "AUTO")
         smu.enable_channel(channel)
         
-        results = []
+        count = 0
+        
+        if settle_time > 0 and len(currents):
+            smu.set_current(channel, currents[0])
         
-        # Create progress bar
-        pbar = tqdm(currents, desc="Current Sweep", unit="pts", unit_scale=False)
-        for current in pbar:
-            smu.set_current(channel, current)
-            time.sleep(0.2)  # Allow settling time
-            v, i = smu.measure_voltage_and_current(channel)
-            results.append({
-                'target_current': current,
-                'measured_current': i,
-                'measured_voltage': v
-            })
-            # Update progress bar description with current measurements
-            pbar.set_description(f"I={i*1e3:.1f}mA, V={v:.3f}V")
+        # Create progress bar - redraw at most 10 times per second
+        pbar = tqdm(currents, desc="Current Sweep", unit="pts", unit_scale=False,
+                    mininterval=0.1, miniters=max(1, len(currents) // 100))
+        last_update = 0.0
+        for k, current in enumerate(pbar):
+            if settle_time > 0:
+                settle(settle_time)  # Allow settling time
+                if k + 1 < len(currents):
+                    # Take this point and send the next setpoint in one write,
+                    # so the output slews while we record the result
+                    v, i = smu.measure_and_set_current(channel, currents[k + 1])
+                else:
+                    v, i = smu.measure_voltage_and_current(channel)
+            else:
+                # No host-side wait needed: send setpoint and measurement together
+                v, i = smu.set_current_and_measure(channel, current)
+            writer.writerow((current, i, v))
+            count += 1
+            # Update progress bar description with current measurements,
+            # throttled so terminal writes don't eat into short dwells
+            now = time.perf_counter()
+            if now - last_update > 0.1:
+                pbar.set_description("I=%.1fmA, V=%.3fV" % (i * 1e3, v), refresh=False)
+                last_update = now
         
-        return results
+        return count
             
     finally:
         # Always disable channel after measurement
@@ -55,25 +136,21 @@ def current_sweep_example(smu: SMU, currents: list, channel: int = 1):
 
 def load_currents_from_csv(filename: str) -> list:
     """Load current values from CSV file"""
-    currents = []
     try:
+        # Skip header if present - only the first line needs checking in Python,
+        # the rest is parsed by numpy in one pass
         with open(filename, 'r', newline='') as f:
-            reader = csv.reader(f)
-            # Skip header if present
-            first_row = next(reader, None)
-            if first_row:
-                try:
-                    # Try to parse first row as float
-                    currents.append(float(first_row[0]))
-                except ValueError:
-                    # First row is header, skip it
-                    pass
-                
-                # Read remaining rows
-                for row in reader:
-                    if row:  # Skip empty rows
-                        currents.append(float(row[0]))
-        
+            first_row = next(csv.reader(f), None)
+        skiprows = 0
+        if first_row:
+            try:
+                float(first_row[0])
+            except ValueError:
+                skiprows = 1
+
+        currents = np.loadtxt(filename, delimiter=',', skiprows=skiprows,
+                              usecols=0, dtype=np.float64, ndmin=1).tolist()
+
         print(f"Loaded {len(currents)} current setpoints from {filename}")
         return currents
     except FileNotFoundError:
@@ -86,8 +163,15 @@ def load_currents_from_csv(filename: str) -> list:
 
 def generate_linear_currents(start: float, stop: float, step: float) -> list:
     """Generate linearly spaced current values"""
-    num_steps = int((stop - start) / step) + 1
-    return [start + i * step for i in range(num_steps)]
+    # Small tolerance so float error in (stop - start) / step (e.g. 19.999...)
+    # can't truncate away the final step
+    num_steps = int(np.floor((stop - start) / step + 1e-9)) + 1
+    last = start + (num_steps - 1) * step
+    return np.linspace(start, last, num_steps).tolist()
+
+
+# Sweeps longer than this are written as Parquet in --format auto
+PARQUET_AUTO_THRESHOLD = 10000
 
 
 def main():
@@ -103,10 +187,16 @@ def main():
                         help='Stop current in Amps (default: 0.010 A = 10mA)')
     parser.add_argument('--step', '-t', type=float, default=0.001,
                         help='Step current in Amps (default: 0.001 A = 1mA)')
+    parser.add_argument('--settle', type=float, default=0.2,
+                        help='Settling time per point in seconds, 0 to disable (default: 0.2)')
     parser.add_argument('--channel', '-c', type=int, default=1,
                         help='SMU channel to use (default: 1)')
     parser.add_argument('--output', '-o', type=str, default='current_sweep_results.csv',
-                        help='Output CSV filename (default: current_sweep_results.csv)')
+                        help='Output filename (default: current_sweep_results.csv)')
+    parser.add_argument('--format', '-f', choices=['auto', 'csv', 'parquet'], default='auto',
+                        help='Output format. "auto" uses Parquet for sweeps over '
+                             f'{PARQUET_AUTO_THRESHOLD} points when pyarrow is installed, '
+                             'otherwise CSV (default: auto)')
     
     args = parser.parse_args()
     
@@ -121,13 +211,27 @@ def main():
         print(f"  Step: {args.step*1000:.1f} mA")
         currents = generate_linear_currents(args.start, args.stop, args.step)
     
+    # Pick output format
+    output_format = args.format
+    if output_format == 'auto':
+        if len(currents) > PARQUET_AUTO_THRESHOLD and pyarrow_available():
+            output_format = 'parquet'
+        else:
+            output_format = 'csv'
+    if output_format == 'parquet':
+        if not pyarrow_available():
+            parser.error("Parquet output requires pyarrow (pip install pyarrow)")
+        if args.output.endswith('.csv'):
+            args.output = os.path.splitext(args.output)[0] + '.parquet'
+    
     # Display sweep parameters
     print(f"\nCurrent Sweep Parameters:")
     print(f"  Port: {args.port}")
     print(f"  Number of setpoints: {len(currents)}")
     print(f"  Current range: {min(currents)*1000:.1f} to {max(currents)*1000:.1f} mA")
     print(f"  Channel: {args.channel}")
-    print(f"  Output: {args.output}")
+    print(f"  Settling time: {args.settle*1000:.0f} ms")
+    print(f"  Output: {args.output} ({output_format})")
     
     try:
         # Create USB manager and connect to SMU
@@ -137,14 +241,19 @@ def main():
         # Use context manager to ensure proper cleanup
         with smu:            
             print("\n--- Current Sweep Example (USB) ---")
-            sweep_results = current_sweep_example(smu, currents, args.channel)
             
-            # Save sweep results to CSV file
-            with open(args.output, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=['target_current', 'measured_current', 'measured_voltage'])
-                writer.writeheader()
-                writer.writerows(sweep_results)
-            print(f"\nResults saved to {args.output}")
+            if output_format == 'parquet':
+                # Collect columns in memory, write one binary file at the end
+                writer = ParquetColumnWriter()
+                count = current_sweep_example(smu, currents, writer, args.channel, args.settle)
+                writer.save(args.output)
+            else:
+                # Stream sweep results straight to the CSV file as they arrive
+                with open(args.output, 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['target_current', 'measured_current', 'measured_voltage'])
+                    count = current_sweep_example(smu, currents, writer, args.channel, args.settle)
+            print(f"\n{count} results saved to {args.output}")
                         
     except SMUException as e:
         print(f"SMU Error: {e}")
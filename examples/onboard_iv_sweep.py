@@ -14,16 +14,28 @@ Features demonstrated:
 """
 
 import time
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
 from minismu_py import SMU, ConnectionType
 
 # Connection parameters - adjust as needed  
 miniSMU_PORT = "COM41"  # Replace with your miniSMU's USB port
 
-def simple_iv_sweep_example():
+# SMU() arguments for each device to run the examples on. With more than
+# one device (e.g. add {"connection_type": ConnectionType.NETWORK,
+# "host": "192.168.1.106"}) the devices are driven in parallel threads.
+DEVICES = [
+    {"connection_type": ConnectionType.USB, "port": miniSMU_PORT},
+]
+
+def sweep_arrays(data):
+    """Return (voltages, currents) of SweepData or a SweepResult as float64 arrays, without copying"""
+    return np.frombuffer(data.voltages), np.frombuffer(data.currents)
+
+def simple_iv_sweep_example(device=DEVICES[0]):
     """Basic I-V sweep example with progress monitoring"""
    
-    with SMU(ConnectionType.USB, port=miniSMU_PORT) as smu:
+    with SMU(**device) as smu:
         print("=== Simple I-V Sweep Example ===\n")
         
         print(f"Device: {smu.get_identity()}")
@@ -59,10 +71,10 @@ def simple_iv_sweep_example():
         for i, point in enumerate(result.data[:3]):
             print(f"  Point {i+1}: {point.voltage:.3f}V, {point.current*1e6:.1f}µA")
 
-def advanced_iv_sweep_example():
+def advanced_iv_sweep_example(device=DEVICES[0]):
     """Advanced I-V sweep configuration example"""    
     
-    with SMU(ConnectionType.USB, port=miniSMU_PORT) as smu:
+    with SMU(**device) as smu:
         print("\n=== Advanced I-V Sweep Configuration ===\n")
         
         channel = 1
@@ -86,41 +98,36 @@ def advanced_iv_sweep_example():
         print("\nExecuting sweep...")
         smu.execute_sweep(channel)
         
-        # Step 4: Monitor progress manually
+        # Step 4: Monitor progress - wait_for_sweep polls less often while
+        # plenty of time remains and more often as the sweep nears the end
         print("Monitoring sweep progress...")
-        while True:
-            status = smu.get_sweep_status(channel)
-            
-            if status.status == "RUNNING":
-                progress = (status.current_point / status.total_points) * 100
-                elapsed_sec = status.elapsed_ms / 1000
-                remaining_sec = status.estimated_remaining_ms / 1000
-                print(f"  {progress:.1f}% complete ({status.current_point}/{status.total_points}) - "
-                      f"Elapsed: {elapsed_sec:.1f}s, Remaining: ~{remaining_sec:.1f}s")
-                time.sleep(1)
-            elif status.status == "COMPLETED":
-                print("  Sweep completed!")
-                break
-            elif status.status == "ABORTED":
-                print("  Sweep was aborted!")
-                return
-            else:
-                time.sleep(0.5)
+        
+        def show_progress(status):
+            progress = (status.current_point / status.total_points) * 100
+            elapsed_sec = status.elapsed_ms / 1000
+            remaining_sec = status.estimated_remaining_ms / 1000
+            print(f"  {progress:.1f}% complete ({status.current_point}/{status.total_points}) - "
+                  f"Elapsed: {elapsed_sec:.1f}s, Remaining: ~{remaining_sec:.1f}s")
+        
+        status = smu.wait_for_sweep(channel, progress_callback=show_progress)
+        if status.status == "ABORTED":
+            print("  Sweep was aborted!")
+            return
+        print("  Sweep completed!")
         
         # Step 5: Retrieve data in CSV format
         data_points = smu.get_sweep_data_csv(channel)
         print(f"\nRetrieved {len(data_points)} data points in CSV format")
         
         # Display voltage range and current range
-        voltages = [p.voltage for p in data_points]
-        currents = [p.current for p in data_points]
-        print(f"Voltage range: {min(voltages):.3f}V to {max(voltages):.3f}V")
-        print(f"Current range: {min(currents)*1e6:.1f}µA to {max(currents)*1e6:.1f}µA")
+        voltages, currents = sweep_arrays(data_points)
+        print(f"Voltage range: {voltages.min():.3f}V to {voltages.max():.3f}V")
+        print(f"Current range: {currents.min()*1e6:.1f}µA to {currents.max()*1e6:.1f}µA")
 
-def format_comparison_example():
+def format_comparison_example(device=DEVICES[0]):
     """Compare CSV vs JSON output formats"""
     
-    with SMU(ConnectionType.USB, port=miniSMU_PORT) as smu:
+    with SMU(**device) as smu:
         print("\n=== Output Format Comparison ===\n")
         
         channel = 1
@@ -141,11 +148,7 @@ def format_comparison_example():
         smu.execute_sweep(channel)
         
         # Wait for completion
-        while True:
-            status = smu.get_sweep_status(channel)
-            if status.status in ["COMPLETED", "ABORTED"]:
-                break
-            time.sleep(0.1)
+        status = smu.wait_for_sweep(channel)
         
         if status.status == "COMPLETED":
             # Get raw data in both formats
@@ -168,10 +171,10 @@ def format_comparison_example():
             print(f"JSON format returned {len(json_data.data)} data points with config metadata")
             print(f"JSON config: {json_data.config.start_voltage}V to {json_data.config.end_voltage}V")
 
-def sweep_abort_example():
+def sweep_abort_example(device=DEVICES[0]):
     """Demonstrate sweep abort functionality"""
       
-    with SMU(ConnectionType.USB, port=miniSMU_PORT) as smu:
+    with SMU(**device) as smu:
         print("\n=== Sweep Abort Example ===\n")
         
         channel = 1
@@ -199,7 +202,10 @@ def sweep_abort_example():
         status = smu.get_sweep_status(channel)
         print(f"Current status: {status.status}, point {status.current_point}/{status.total_points}")
         
-        # Abort the sweep
+        # Abort the sweep, unless it has already finished
+        if status.status in ("COMPLETED", "ABORTED", "IDLE"):
+            print("Sweep already stopped, nothing to abort")
+            return
         print("Aborting sweep...")
         smu.abort_sweep(channel)
         
@@ -209,10 +215,32 @@ def sweep_abort_example():
         print(f"Final status: {final_status.status}")
         print(f"Sweep stopped at point {final_status.current_point} of {final_status.total_points}")
 
-def plot_iv_curve_example():
-    """Run sweep and plot the I-V curve"""
+def _render_png(voltages, currents, filename):
+    """Plot an I-V curve to a PNG file; runs in a worker process"""
+    import matplotlib
+    matplotlib.use('Agg')  # No display needed in the worker
+    import matplotlib.pyplot as plt
+    
+    fig = plt.figure(figsize=(10, 6))
+    plt.plot(voltages, currents * 1e6, 'b.-', linewidth=2, markersize=4)
+    plt.xlabel('Voltage (V)')
+    plt.ylabel('Current (µA)')
+    plt.title('miniSMU I-V Sweep Results')
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    fig.savefig(filename, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    return filename
+
+def plot_iv_curve_example(render_pool, device=DEVICES[0], filename='iv_sweep_results.png'):
+    """
+    Run sweep and plot the I-V curve
+    
+    The PNG is rendered by render_pool so the caller can carry on talking to
+    the SMU; returns the rendering future, whose result is the file name.
+    """
         
-    with SMU(ConnectionType.USB, port=miniSMU_PORT) as smu:
+    with SMU(**device) as smu:
         print("\n=== I-V Curve Plotting Example ===\n")
         
         # Run a sweep suitable for plotting
@@ -227,45 +255,58 @@ def plot_iv_curve_example():
             monitor_progress=False
         )
         
-        # Extract data for plotting
-        voltages = [p.voltage for p in result.data]
-        currents = [p.current * 1e6 for p in result.data]  # Convert to µA
-        
-        # Create plot
-        plt.figure(figsize=(10, 6))
-        plt.plot(voltages, currents, 'b.-', linewidth=2, markersize=4)
-        plt.xlabel('Voltage (V)')
-        plt.ylabel('Current (µA)')
-        plt.title('miniSMU I-V Sweep Results')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        # Save plot
-        plt.savefig('iv_sweep_results.png', dpi=150, bbox_inches='tight')
-        print(f"I-V curve plotted and saved as 'iv_sweep_results.png'")
+        # Extract data for plotting - copy out of the sweep buffers so the
+        # arrays can be pickled to the render process
+        voltages, currents = (a.copy() for a in sweep_arrays(result))
+        
+        # Render and save the plot in the background
+        future = render_pool.submit(_render_png, voltages, currents, filename)
         print(f"Data points: {len(result.data)}")
-        print(f"Voltage range: {min(voltages):.3f}V to {max(voltages):.3f}V")
-        print(f"Current range: {min(currents):.1f}µA to {max(currents):.1f}µA")
+        print(f"Voltage range: {voltages.min():.3f}V to {voltages.max():.3f}V")
+        print(f"Current range: {currents.min()*1e6:.1f}µA to {currents.max()*1e6:.1f}µA")
+        return future
 
-def main():
-    """Run all I-V sweep examples"""
+def run_examples(device, render_pool, plot_filename='iv_sweep_results.png'):
+    """Run every example on one device, rendering the plot in render_pool"""
+    simple_iv_sweep_example(device)
+    advanced_iv_sweep_example(device)
+    format_comparison_example(device)
+    # The plot renders while the abort example runs
+    plot_future = plot_iv_curve_example(render_pool, device, plot_filename)
+    sweep_abort_example(device)
+    
+    # Only report the plot if matplotlib is available
+    try:
+        filename = plot_future.result()
+        print(f"\nI-V curve plotted and saved as '{filename}'")
+    except ImportError:
+        print("\nSkipping plot example (matplotlib not available)")
+
+def main(devices=DEVICES):
+    """
+    Run all I-V sweep examples
+    
+    Each device gets its own SMU connections. With several devices the
+    example runs go to a thread pool - the work is almost all waiting on
+    serial/socket I/O, so one device's sweep dwell overlaps the others'.
+    Output from the threads is interleaved.
+    """
     
     try:
         print("miniSMU Onboard I-V Sweep Examples")
         print("==================================")
         print("Note: These examples require firmware v1.3.4 or later\n")
         
-        # Run examples
-        simple_iv_sweep_example()
-        advanced_iv_sweep_example()
-        format_comparison_example()
-        sweep_abort_example()
-        
-        # Only try plotting if matplotlib is available
-        try:
-            plot_iv_curve_example()
-        except ImportError:
-            print("\nSkipping plot example (matplotlib not available)")
+        with ProcessPoolExecutor(max_workers=1) as render_pool:
+            if len(devices) == 1:
+                run_examples(devices[0], render_pool)
+            else:
+                with ThreadPoolExecutor(max_workers=len(devices)) as device_pool:
+                    runs = [device_pool.submit(run_examples, device, render_pool,
+                                               f'iv_sweep_results_{n}.png')
+                            for n, device in enumerate(devices, 1)]
+                    for run in runs:
+                        run.result()  # Re-raise any failure
             
         print("\n✓ All I-V sweep examples completed!")
         
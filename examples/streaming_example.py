@@ -1,6 +1,8 @@
 from minismu_py import SMU, ConnectionType, SMUException
 import time
-import csv
+import queue
+import threading
+from array import array
 from typing import Optional
 from tqdm import tqdm
 import numpy as np
@@ -24,18 +26,80 @@ class SMUStreamingManager:
             print(f"Failed to connect to SMU: {e}")
             raise
 
-def streaming_example(smu: SMU, channel: int = 1, duration: float = 10.0, 
-                     sample_rate: float = 100.0, voltage: float = 3.3):
+# Give up if no samples arrive for this long (device stopped sending)
+STALL_TIMEOUT_NS = 3_000_000_000  # 3 s
+
+CSV_HEADER = 'Channel,Timestamp (s),Voltage (V),Current (A)'
+# Full precision for timestamps - device time is Unix milliseconds (13 digits)
+CSV_FORMAT = ['%d', '%.17g', '%.12g', '%.12g']
+
+class CSVBatchWriter(threading.Thread):
+    """
+    Append (timestamps, voltages, currents) batches to a CSV file
+
+    Runs on its own thread so disk writes never hold up the USB reads. The
+    queue is bounded so a stalled disk slows the reader rather than piling up
+    memory; if writing fails, the error is kept and re-raised to the reader
+    instead of leaving it blocked on a full queue.
+    """
+    def __init__(self, filename: str, channel: int, maxsize: int = 16):
+        super().__init__(daemon=True)
+        self.filename = filename
+        self.channel = channel
+        self.error: Optional[BaseException] = None
+        self._batches = queue.Queue(maxsize=maxsize)
+
+    def run(self):
+        try:
+            with open(self.filename, 'w') as f:
+                f.write(CSV_HEADER + '\n')
+                while True:
+                    batch = self._batches.get()
+                    if batch is None:
+                        break
+                    t, v, i = batch
+                    np.savetxt(f, np.column_stack((np.full(len(t), self.channel), t, v, i)),
+                               delimiter=',', fmt=CSV_FORMAT)
+        except Exception as e:
+            self.error = e
+
+    def put(self, batch):
+        """Queue a batch (None to finish), raising the writer's error if it has stopped"""
+        while True:
+            if not self.is_alive():
+                raise self.error or RuntimeError("CSV writer is not running")
+            try:
+                self._batches.put(batch, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        """Write out everything queued, then re-raise any write error"""
+        if self.is_alive():
+            self.put(None)
+            self.join()
+        if self.error is not None:
+            raise self.error
+
+def streaming_example(smu: SMU, channel: int = 1, duration: Optional[float] = 10.0, 
+                     sample_rate: float = 100.0, voltage: float = 3.3,
+                     save_format: str = "csv"):
     """
     Demonstrate streaming functionality of the SMU
     
     Args:
         smu: SMU instance
         channel: Channel number (1 or 2)
-        duration: Duration of streaming in seconds
+        duration: Duration of streaming in seconds, or None to stream until
+                  interrupted with Ctrl-C
         sample_rate: Sample rate in Hz
         voltage: Voltage to apply during streaming
+        save_format: "csv" for a text file written while streaming, or "npy"
+                     for a numpy binary file of rows (channel, timestamp,
+                     voltage, current) saved at the end
     """
+    writer = None
     try:
         # Configure channel
         smu.set_mode(channel, "FVMI")  # Force Voltage, Measure Current mode
@@ -47,43 +111,101 @@ def streaming_example(smu: SMU, channel: int = 1, duration: float = 10.0,
         smu.set_sample_rate(channel, sample_rate)
         
         # Set miniSMU's internal time for timestamping
-        current_time = int(time.time() * 1000)  # Convert to milliseconds
+        current_time = time.time_ns() // 1_000_000  # Integer milliseconds
         smu.set_time(current_time)
         
-        # Calculate number of samples
-        num_samples = int(duration * sample_rate)
+        # Calculate number of samples (None for an open-ended capture)
+        num_samples = int(duration * sample_rate) if duration is not None else None
+        
+        # Create progress bar - redraw at most 10 times per second
+        pbar = tqdm(total=num_samples, desc="Streaming Data", unit="samples",
+                    mininterval=0.1)
+        last_update = 0
         
-        # Create progress bar
-        pbar = tqdm(total=num_samples, desc="Streaming Data", unit="samples")
+        # Prepare data storage - preallocate when the sample count is known,
+        # otherwise grow unboxed array('d') columns
+        if num_samples is not None:
+            timestamps = np.empty(num_samples, dtype=np.float64)
+            voltages = np.empty(num_samples, dtype=np.float64)
+            currents = np.empty(num_samples, dtype=np.float64)
+        else:
+            timestamps, voltages, currents = array('d'), array('d'), array('d')
+        count = 0
         
-        # Prepare data storage
-        timestamps = []
-        voltages = []
-        currents = []
+        # Running sums for the statistics, updated while each batch is hot
+        sum_v = sum_v2 = sum_i = sum_i2 = 0.0
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if save_format == "npy":
+            filename = f'streaming_data_{timestamp}.npy'
+        else:
+            # Hand each batch to a writer thread as it arrives
+            filename = f'streaming_data_{timestamp}.csv'
+            writer = CSVBatchWriter(filename, channel)
+            writer.start()
         
         # Start streaming
         print("Starting streaming...")
         response = smu.start_streaming(channel)
         
-        # Collect data
-        while len(timestamps) < num_samples:
-            try:
-                # Read streaming data packet
-                data_channel, t, v, i = smu.read_streaming_data()
-                
-                # Only process data from the requested channel
-                if data_channel == channel:
-                    timestamps.append(t)
-                    voltages.append(v)
-                    currents.append(i)
-                    
-                    # Update progress bar
-                    pbar.update(1)
-                    pbar.set_description(f"V={v:.3f}V, I={i*1e6:.1f}µA")
-                
-            except SMUException as e:
-                print(f"\nError reading streaming data: {e}")
-                break
+        # Collect data - each read drains everything buffered so far
+        # Look up the methods used on every batch once, outside the loop
+        read_batch = smu.read_streaming_batch
+        update = pbar.update
+        set_description = pbar.set_description
+        perf_counter_ns = time.perf_counter_ns
+        last_data = perf_counter_ns()
+        try:
+            while num_samples is None or count < num_samples:
+                try:
+                    # Read a batch of streaming packets for the requested channel
+                    t_batch, v_batch, i_batch = read_batch(
+                        max_packets=num_samples - count if num_samples is not None else 256,
+                        channel=channel)
+                except SMUException as e:
+                    print(f"\nError reading streaming data: {e}")
+                    break
+            
+                n = len(t_batch)
+                if n == 0:
+                    if perf_counter_ns() - last_data > STALL_TIMEOUT_NS:
+                        print("\nNo streaming data received, stopping early")
+                        break
+                    continue
+                last_data = perf_counter_ns()
+                if num_samples is not None:
+                    t_new = timestamps[count:count + n]
+                    v_new = voltages[count:count + n]
+                    i_new = currents[count:count + n]
+                    t_new[:] = t_batch
+                    v_new[:] = v_batch
+                    i_new[:] = i_batch
+                else:
+                    timestamps.extend(t_batch)
+                    voltages.extend(v_batch)
+                    currents.extend(i_batch)
+                    t_new, v_new, i_new = (np.frombuffer(b) for b in (t_batch, v_batch, i_batch))
+                if writer is not None:
+                    writer.put((t_new, v_new, i_new))
+                # Count the batch together with its sums so an interrupt
+                # can't leave the statistics half updated
+                sum_v, sum_v2, sum_i, sum_i2, count = (
+                    sum_v + v_new.sum(), sum_v2 + v_new @ v_new,
+                    sum_i + i_new.sum(), sum_i2 + i_new @ i_new, count + n)
+            
+                # Update progress bar, formatting the description only ~10 Hz
+                update(n)
+                now = perf_counter_ns()
+                if now - last_update > 100_000_000:  # 0.1 s
+                    set_description("V=%.3fV, I=%.1fµA" % (v_batch[-1], i_batch[-1] * 1e6),
+                                    refresh=False)
+                    last_update = now
+        except KeyboardInterrupt:
+            if num_samples is not None:
+                raise
+            # Ctrl-C ends an open-ended capture, wherever in the loop it
+            # lands - fall through to the stats and save what was read
+            print()
         
         # Stop streaming
         print("Stopping streaming...")
@@ -93,33 +215,54 @@ def streaming_example(smu: SMU, channel: int = 1, duration: float = 10.0,
             
         pbar.close()
         
-        # Calculate statistics
-        v_mean = np.mean(voltages)
-        v_std = np.std(voltages)
-        i_mean = np.mean(currents)
-        i_std = np.std(currents)
+        # Drop unused slots if streaming stopped early, or view the grown
+        # columns as numpy arrays without copying
+        if num_samples is not None:
+            timestamps = timestamps[:count]
+            voltages = voltages[:count]
+            currents = currents[:count]
+        else:
+            # An interrupt may land between growing the columns and counting
+            # the batch, so trim to what was counted
+            timestamps = np.frombuffer(timestamps)[:count]
+            voltages = np.frombuffer(voltages)[:count]
+            currents = np.frombuffer(currents)[:count]
+        
+        # Calculate statistics from the running sums - no second pass
+        n = max(count, 1)
+        v_mean = sum_v / n
+        v_std = max(sum_v2 / n - v_mean ** 2, 0.0) ** 0.5
+        i_mean = sum_i / n
+        i_std = max(sum_i2 / n - i_mean ** 2, 0.0) ** 0.5
         
         print("\nStreaming Statistics:")
         print(f"Voltage: {v_mean:.3f}V ± {v_std:.3f}V")
         print(f"Current: {i_mean*1e6:.1f}µA ± {i_std*1e6:.1f}µA")
         
-        # Save data to CSV
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f'streaming_data_{timestamp}.csv'
-        
-        with open(filename, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Channel', 'Timestamp (s)', 'Voltage (V)', 'Current (A)'])
-            for t, v, i in zip(timestamps, voltages, currents):
-                writer.writerow([channel, t, v, i])
+        if writer is not None:
+            # Let the writer drain the queue and close the file
+            closing, writer = writer, None
+            closing.close()
+        else:
+            # Raw binary - no text formatting, reload with np.load()
+            np.save(filename, np.column_stack((np.full(count, channel),
+                                               timestamps, voltages, currents)))
         
         print(f"\nData saved to {filename}")
         return timestamps, voltages, currents
             
     finally:
-        # Always disable channel after measurement
-        smu.disable_channel(channel)
+        # Make sure streaming is off (a no-op if it was already stopped
+        # above) and always disable channel after measurement
         smu.stop_streaming(channel)
+        smu.disable_channel(channel)
+        if writer is not None:
+            # Stopped early - keep what was already queued, without masking
+            # the error that got us here
+            try:
+                writer.close()
+            except Exception as e:
+                print(f"Failed to write {writer.filename}: {e}")
 
 def main():
     # Connection parameters
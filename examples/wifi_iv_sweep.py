@@ -1,9 +1,8 @@
 from minismu_py import SMU, ConnectionType, SMUException
 import json
-import time
-import csv
 from typing import Optional
 from tqdm import tqdm
+import numpy as np
 
 class SMUWiFiManager:
     """Helper class to manage WiFi connection to SMU"""
@@ -24,32 +23,40 @@ class SMUWiFiManager:
             raise
 
 def voltage_sweep_example(smu: SMU, channel: int = 1):
-    """Perform a voltage sweep and measure current"""
+    """
+    Perform a voltage sweep and measure current
+    
+    Each step measures until the voltage is on target and the current has
+    stopped changing, waiting at most 200 ms per point.
+    For plain I-V curves the onboard sweep (smu.run_iv_sweep, see
+    onboard_iv_sweep.py) avoids per-point round trips entirely.
+    """
     try:
         # Configure channel
         smu.set_mode(channel, "FVMI")  # Force Voltage, Measure Current mode
         smu.set_voltage_range(channel, "AUTO")
         smu.enable_channel(channel)
         
-        # Perform voltage sweep from -1V to 0.7V
-        voltages = [v/100 for v in range(-100, 70, 2)]  # -1V to 0.7V in 20mV steps
-        results = []
+        # Perform voltage sweep from -1V to 0.68V in 20mV steps
+        voltages = np.linspace(-1.0, 0.68, 85)
+        measured_voltages = np.empty_like(voltages)
+        measured_currents = np.empty_like(voltages)
         
         # Create progress bar
         pbar = tqdm(voltages, desc="Voltage Sweep", unit="pts", unit_scale=False)
-        for voltage in pbar:
-            smu.set_voltage(channel, voltage)
-            time.sleep(0.2)  # Allow settling time
-            v, i = smu.measure_voltage_and_current(channel)
-            results.append({
-                'target_voltage': voltage,
-                'measured_voltage': v,
-                'measured_current': i
-            })
+        # Look up the methods used on every point once, outside the loop
+        set_voltage_settled = smu.set_voltage_settled
+        set_description = pbar.set_description
+        for k, voltage in enumerate(pbar):
+            # Allow settling time - measure until voltage and current have
+            # settled, falling back to the full 200 ms if they don't
+            v, i = set_voltage_settled(channel, voltage, timeout=0.2)
+            measured_voltages[k] = v
+            measured_currents[k] = i
             # Update progress bar description with current measurements
-            pbar.set_description(f"V={v:.3f}V, I={i*1e6:.1f}µA")
+            set_description(f"V={v:.3f}V, I={i*1e6:.1f}µA")
         
-        return results
+        return voltages, measured_voltages, measured_currents
             
     finally:
         # Always disable channel after measurement
@@ -71,11 +78,10 @@ def main():
             print("\n--- Voltage Sweep Example ---")
             sweep_results = voltage_sweep_example(smu, channel=1)
             
-            # Save sweep results to CSV file
-            with open('voltage_sweep_results.csv', 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=['target_voltage', 'measured_voltage', 'measured_current'])
-                writer.writeheader()
-                writer.writerows(sweep_results)
+            # Save sweep results to CSV file in one write
+            np.savetxt('voltage_sweep_results.csv', np.column_stack(sweep_results), delimiter=',',
+                       header='target_voltage,measured_voltage,measured_current',
+                       comments='', fmt='%.12g')
             print("\nResults saved to voltage_sweep_results.csv")
                         
     except SMUException as e:
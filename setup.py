@@ -37,5 +37,8 @@ setup(
         "dev": [
             "tqdm>=4.65.0",
         ],
+        "fast": [
+            "orjson>=3.0",
+        ],
     },
 ) 
\ No newline at end of file
@@ -1,12 +1,12 @@
 from .smu import (
     SMU, ConnectionType, SMUException, WifiStatus,
-    SweepStatus, SweepConfig, SweepDataPoint, SweepResult,
+    SweepStatus, SweepConfig, SweepDataPoint, SweepData, SweepResult,
     CURRENT_RANGE_LIMITS
 )
 
 __version__ = "0.3.2"
 __all__ = [
     "SMU", "ConnectionType", "SMUException", "WifiStatus",
-    "SweepStatus", "SweepConfig", "SweepDataPoint", "SweepResult",
+    "SweepStatus", "SweepConfig", "SweepDataPoint", "SweepData", "SweepResult",
     "CURRENT_RANGE_LIMITS"
 ]
@@ -2,11 +2,29 @@ import serial
 import socket
 import time
 import json
+import math
 import re
+import threading
+from array import array
+from bisect import bisect_left
 from enum import Enum
-from typing import Optional, Tuple, Union, List
+from typing import Optional, Tuple, Union, List, Dict, Any, Callable, Iterator, Sequence
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:  # Optional: pip install minismu_py[fast]
+    orjson = None
+
+def _json_loads(text: str) -> Any:
+    """Parse JSON with orjson when installed, falling back to the json module"""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN literals, which only the json module accepts
+    return json.loads(text)
+
 @dataclass
 class WifiStatus:
     connected: bool
@@ -33,14 +51,97 @@ class SweepConfig:
 
 @dataclass
 class SweepDataPoint:
+    __slots__ = ('timestamp', 'voltage', 'current')
+
     timestamp: int
     voltage: float
     current: float
 
+class SweepData(Sequence):
+    """
+    Sweep data points stored column-wise
+
+    Timestamps, voltages and currents are kept in array.array columns that
+    are filled in one pass over the device response. SweepDataPoint objects
+    are only created when the data is indexed or iterated; use the column
+    attributes (or numpy.frombuffer on them) for bulk processing.
+    """
+
+    __slots__ = ('timestamps', 'voltages', 'currents')
+
+    def __init__(self, timestamps=(), voltages=(), currents=()):
+        self.timestamps = array('q', timestamps)
+        self.voltages = array('d', voltages)
+        self.currents = array('d', currents)
+
+    @classmethod
+    def from_csv(cls, text: str) -> 'SweepData':
+        """Parse "timestamp,voltage,current" lines into columns"""
+        rows = [line.split(',') for line in text.strip().split('\n')]
+        rows = [parts for parts in rows if len(parts) >= 3]
+        if not rows:
+            return cls()
+        timestamps, voltages, currents = list(zip(*rows))[:3]
+        return cls((int(float(t)) for t in timestamps),
+                   map(float, voltages), map(float, currents))
+
+    @classmethod
+    def from_json(cls, points: List[Dict[str, Any]]) -> 'SweepData':
+        """Build columns from the "data" list of a JSON sweep response"""
+        return cls((int(p['t']) for p in points),
+                   (float(p['v']) for p in points),
+                   (float(p['i']) for p in points))
+
+    def to_list(self) -> List[SweepDataPoint]:
+        """Return the points as a plain list, e.g. for dataclasses.asdict()"""
+        return list(self)
+
+    def __len__(self) -> int:
+        return len(self.voltages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SweepData(self.timestamps[index], self.voltages[index],
+                             self.currents[index])
+        return SweepDataPoint(timestamp=self.timestamps[index],
+                              voltage=self.voltages[index],
+                              current=self.currents[index])
+
+    def __iter__(self) -> Iterator[SweepDataPoint]:
+        for t, v, i in zip(self.timestamps, self.voltages, self.currents):
+            yield SweepDataPoint(timestamp=t, voltage=v, current=i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SweepData):
+            return (self.timestamps == other.timestamps and
+                    self.voltages == other.voltages and
+                    self.currents == other.currents)
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SweepData({len(self)} points)"
+
 @dataclass
 class SweepResult:
     config: SweepConfig
-    data: List[SweepDataPoint]
+    data: SweepData
+
+    @property
+    def timestamps(self) -> array:
+        """Timestamp column of the sweep data"""
+        return self.data.timestamps
+
+    @property
+    def voltages(self) -> array:
+        """Voltage column of the sweep data"""
+        return self.data.voltages
+
+    @property
+    def currents(self) -> array:
+        """Current column of the sweep data"""
+        return self.data.currents
 
 class ConnectionType(Enum):
     USB = "usb"
@@ -60,11 +161,21 @@ CURRENT_RANGE_LIMITS = {
     4: 180e-3,    # Range 4: ± 180 mA
 }
 
+# Range limits in range-index order, for bisecting by expected current
+_SORTED_RANGE_LIMITS = tuple(CURRENT_RANGE_LIMITS[i] for i in sorted(CURRENT_RANGE_LIMITS))
+
 class SMU:
-    """Interface for the SMU device supporting both USB and network connections"""
+    """
+    Interface for the SMU device supporting both USB and network connections
+
+    An SMU instance can be shared between threads: each command/response
+    exchange holds an internal lock, so requests from different threads are
+    never interleaved on the wire.
+    """
     
     def __init__(self, connection_type: ConnectionType, port: str = "/dev/ttyACM0", 
-                 host: str = "192.168.1.1", tcp_port: int = 3333):
+                 host: str = "192.168.1.1", tcp_port: int = 3333,
+                 low_latency: bool = True, usb_chunk_bytes: int = 8192):
         """
         Initialize SMU connection
         
@@ -73,9 +184,32 @@ class SMU:
             port: Serial port for USB connection
             host: IP address for network connection
             tcp_port: TCP port for network connection
+            low_latency: Request low-latency mode on the USB serial port
+                         (ignored where the platform/driver doesn't support it)
+            usb_chunk_bytes: Largest single read from the USB port, also used
+                             as the driver buffer size where pyserial can set
+                             it (Windows). Larger chunks mean fewer reads while
+                             streaming, but very large transfers can stall on
+                             some hosts; values below 4096 are rejected
         """
+        if usb_chunk_bytes < 4096:
+            raise ValueError(f"usb_chunk_bytes must be at least 4096, got {usb_chunk_bytes}")
+
         self.connection_type = connection_type
         self._connection = None
+        # Bytes read from the USB port but not yet consumed as a line.
+        self._rx_buffer = bytearray()
+        self._usb_chunk_bytes = usb_chunk_bytes
+        # Last value written or read back for settings that are safe to skip
+        # re-sending, keyed by (setting, channel). Anything that can change
+        # them on the device side (reset, 4-wire mode, sweeps) drops the
+        # affected entries.
+        self._state: Dict[Tuple[str, int], Any] = {}
+        # Serialises command/response exchanges between threads. Re-entrant
+        # because the TCP path of _send_commands goes through _send_command.
+        self._lock = threading.RLock()
+        # *IDN? response, fixed for the life of the connection.
+        self._identity: Optional[str] = None
 
         # Detected firmware version from *IDN?, or None if we couldn't parse it.
         self.firmware_version: Optional[Tuple[int, int, int]] = None
@@ -90,6 +224,10 @@ class SMU:
                 self._connection = serial.Serial(port, 115200, timeout=1)
             except serial.SerialException as e:
                 raise SMUException(f"Failed to open USB connection: {e}")
+
+            if low_latency:
+                self._enable_low_latency()
+            self._set_usb_buffer_size()
         else:
             try:
                 self._connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -103,6 +241,31 @@ class SMU:
             # requires it - so "\n" works against any version we care about.
             self._detect_firmware_version_over_tcp()
 
+    def _enable_low_latency(self) -> None:
+        """Best-effort ASYNC_LOW_LATENCY on the serial port.
+
+        Every command is a request/response round trip, so the driver's
+        receive latency timer is paid on each one. pyserial only implements
+        this on POSIX, and some drivers reject the ioctl - either way we just
+        carry on with the default latency.
+        """
+        try:
+            self._connection.set_low_latency_mode(True)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            pass
+
+    def _set_usb_buffer_size(self) -> None:
+        """Best-effort driver buffer sizing to match the read chunk size.
+
+        Only pyserial's Windows backend implements set_buffer_size(); other
+        platforms keep the driver's own buffering.
+        """
+        try:
+            self._connection.set_buffer_size(rx_size=self._usb_chunk_bytes,
+                                             tx_size=self._usb_chunk_bytes)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            pass
+
     @staticmethod
     def _parse_firmware_version(idn: str) -> Optional[Tuple[int, int, int]]:
         """Extract (major, minor, patch) from an *IDN? response, or None."""
@@ -126,6 +289,8 @@ class SMU:
         except (socket.error, UnicodeDecodeError):
             return
 
+        if idn:
+            self._identity = idn
         version = self._parse_firmware_version(idn)
         if version is None:
             return
@@ -145,12 +310,13 @@ class SMU:
             Response from device
         """
         try:
-            if self.connection_type == ConnectionType.USB:
-                self._connection.write(f"{command}\n".encode())
-                response = self._read_usb_response(command)
-            else:
-                self._connection.sendall(f"{command}{self._tcp_command_suffix}".encode())
-                response = self._connection.recv(1024).decode().strip()
+            with self._lock:
+                if self.connection_type == ConnectionType.USB:
+                    self._connection.write(f"{command}\n".encode())
+                    response = self._read_usb_response(command)
+                else:
+                    self._connection.sendall(f"{command}{self._tcp_command_suffix}".encode())
+                    response = self._connection.recv(1024).decode().strip()
             
             # Check if response is an acknowledgment
             if response == "OK":
@@ -166,6 +332,136 @@ class SMU:
         except (serial.SerialException, socket.error) as e:
             raise SMUException(f"Communication error: {e}")
 
+    def _send_commands(self, commands: List[str]) -> List[str]:
+        """
+        Send several commands back-to-back and collect one response per command
+
+        Over USB the commands go out in a single write, so the device can
+        start on the next command without waiting for the host to turn
+        around; responses are then read in order. The TCP path has no line
+        framing on the receive side, so there each command is sent and
+        answered in turn.
+
+        Args:
+            commands: Command strings to send, in order
+
+        Returns:
+            Responses from the device, one per command
+        """
+        if self.connection_type != ConnectionType.USB:
+            with self._lock:
+                return [self._send_command(command) for command in commands]
+
+        try:
+            with self._lock:
+                self._connection.write("".join(f"{command}\n" for command in commands).encode())
+                return [self._read_usb_response(command) for command in commands]
+        except serial.SerialException as e:
+            raise SMUException(f"Communication error: {e}")
+
+    def _send_setting(self, key: Tuple[str, int], value: Any, command: str) -> None:
+        """
+        Send a configuration command unless the device already has this value
+
+        Args:
+            key: (setting, channel) key into the shadow state
+            value: Value the command sets
+            command: Command string to send
+        """
+        with self._lock:
+            if key in self._state and self._state[key] == value:
+                return
+            response = self._send_command(command)
+            # Only an explicit acknowledgment means the device applied it -
+            # errors and timed-out (empty) replies must be sent again
+            if response == "OK":
+                self._state[key] = value
+            else:
+                self._state.pop(key, None)
+
+    def _query_setting(self, key: Tuple[str, int], command: str,
+                       parse: Callable[[str], Any]) -> Any:
+        """
+        Query a configuration value, answering from the shadow state if known
+
+        Args:
+            key: (setting, channel) key into the shadow state
+            command: Query command to send on a cache miss
+            parse: Converts the response into the cached value
+
+        Returns:
+            The parsed setting value
+        """
+        with self._lock:
+            if key not in self._state:
+                response = self._send_command(command)
+                if response.startswith("ERROR"):
+                    return parse(response)
+                self._state[key] = parse(response)
+            return self._state[key]
+
+    def _readline_usb(self) -> bytes:
+        """
+        Read one newline-terminated line from the USB port
+
+        pyserial's readline() pulls a single byte per read() call. Instead we
+        read everything the driver already has buffered in one call and split
+        lines out of our own buffer, only going back to the port when no
+        complete line is left.
+
+        Returns:
+            The line including its terminator, or whatever partial data
+            arrived before the read timed out (b"" if nothing did)
+        """
+        buffer = self._rx_buffer
+        while True:
+            newline = buffer.find(b"\n")
+            if newline >= 0:
+                line = bytes(buffer[:newline + 1])
+                del buffer[:newline + 1]
+                return line
+
+            chunk = self._connection.read(
+                min(max(1, self._connection.in_waiting), self._usb_chunk_bytes))
+            if not chunk:
+                line = bytes(buffer)
+                buffer.clear()
+                return line
+            buffer += chunk
+
+    def _read_usb_lines(self, max_lines: int) -> List[bytes]:
+        """
+        Read up to max_lines complete lines from the USB port
+
+        Waits (up to the port timeout) only until at least one full line is
+        available, then takes everything else the driver has queued in the
+        same pass.
+
+        Returns:
+            Lines without their terminators; empty if the read timed out
+        """
+        buffer = self._rx_buffer
+        while buffer.find(b"\n") < 0:
+            chunk = self._connection.read(
+                min(max(1, self._connection.in_waiting), self._usb_chunk_bytes))
+            if not chunk:
+                return []
+            buffer += chunk
+
+        waiting = min(self._connection.in_waiting, self._usb_chunk_bytes)
+        if waiting:
+            buffer += self._connection.read(waiting)
+
+        end = -1
+        for _ in range(max_lines):
+            newline = buffer.find(b"\n", end + 1)
+            if newline < 0:
+                break
+            end = newline
+        lines = bytes(buffer[:end]).split(b"\n")
+        del buffer[:end + 1]
+        return lines
+
     def _read_usb_response(self, command: str) -> str:
         """
         Read USB response with support for chunked JSON data
@@ -182,10 +478,10 @@ class SMU:
         
         # First, try to read the initial response with robust decoding
         try:
-            initial_response = self._connection.readline().decode('utf-8', errors='replace').strip()
+            initial_response = self._readline_usb().decode('utf-8', errors='replace').strip()
         except UnicodeDecodeError:
             # Fallback for severely corrupted data
-            raw_data = self._connection.readline()
+            raw_data = self._readline_usb()
             initial_response = raw_data.decode('utf-8', errors='ignore').strip()
         
         # If it's a simple response (not JSON), return immediately
@@ -198,7 +494,9 @@ class SMU:
         # Try to parse as JSON to see if it's complete
         current_response = ''.join(response_buffer)
         
-        # Quick check: if it looks like complete JSON, try parsing it
+        # Quick check: if it looks like complete JSON, try parsing it. These
+        # probes only validate, so they use the json module alone (it accepts
+        # NaN) rather than paying for a second parse on every chunk
         if self._is_likely_complete_json(current_response):
             try:
                 json.loads(current_response)
@@ -215,10 +513,10 @@ class SMU:
                 
                 # Read chunk with robust decoding
                 try:
-                    chunk = self._connection.readline().decode('utf-8', errors='replace').strip()
+                    chunk = self._readline_usb().decode('utf-8', errors='replace').strip()
                 except UnicodeDecodeError:
                     # Fallback for severely corrupted chunks
-                    raw_chunk = self._connection.readline()
+                    raw_chunk = self._readline_usb()
                     chunk = raw_chunk.decode('utf-8', errors='ignore').strip()
                 
                 # Restore original timeout
@@ -353,11 +651,18 @@ class SMU:
         return json_str
 
     def get_identity(self) -> str:
-        """Get device identification"""
-        return self._send_command("*IDN?")
+        """Get device identification (queried once per connection)"""
+        with self._lock:
+            if self._identity is None:
+                identity = self._send_command("*IDN?")
+                if not identity:
+                    return identity
+                self._identity = identity
+            return self._identity
 
     def reset(self):
         """Reset the device"""
+        self._state.clear()
         self._send_command("*RST")
 
     # Source and Measurement Methods
@@ -438,9 +743,143 @@ class SMU:
             Tuple of (voltage, current)
         """
         response = self._send_command(f"MEAS{channel}:VOLT:CURR?")
+        return self._parse_voltage_and_current(response)
+
+    @staticmethod
+    def _parse_voltage_and_current(response: str) -> Tuple[float, float]:
+        """Parse a "voltage,current" measurement response"""
         voltage, current = map(float, response.split(','))
         return voltage, current
 
+    def set_voltage_and_measure(self, channel: int, voltage: float) -> Tuple[float, float]:
+        """
+        Set voltage and measure voltage and current in one round trip
+
+        Both commands are written together, so there is no host-side
+        settling delay between them - use this when the device's own
+        settling is sufficient.
+
+        Args:
+            channel: Channel number (1 or 2)
+            voltage: Voltage value in volts
+
+        Returns:
+            Tuple of (voltage, current)
+        """
+        _, response = self._send_commands([f"SOUR{channel}:VOLT {voltage}",
+                                           f"MEAS{channel}:VOLT:CURR?"])
+        return self._parse_voltage_and_current(response)
+
+    def set_current_and_measure(self, channel: int, current: float) -> Tuple[float, float]:
+        """
+        Set current and measure voltage and current in one round trip
+
+        Both commands are written together, so there is no host-side
+        settling delay between them - use this when the device's own
+        settling is sufficient.
+
+        Args:
+            channel: Channel number (1 or 2)
+            current: Current value in amperes
+
+        Returns:
+            Tuple of (voltage, current)
+        """
+        _, response = self._send_commands([f"SOUR{channel}:CURR {current}",
+                                           f"MEAS{channel}:VOLT:CURR?"])
+        return self._parse_voltage_and_current(response)
+
+    def measure_channels(self, channels: List[int]) -> List[Tuple[float, float]]:
+        """
+        Measure voltage and current on several channels in one round trip
+
+        All measurement queries are written together and the responses read
+        back in order, so the channels are measured back-to-back by the device
+        instead of each waiting on its own host round trip.
+
+        Args:
+            channels: Channel numbers to measure, e.g. [1, 2]
+
+        Returns:
+            List of (voltage, current) tuples in the same order as `channels`
+        """
+        responses = self._send_commands([f"MEAS{channel}:VOLT:CURR?" for channel in channels])
+        return [self._parse_voltage_and_current(response) for response in responses]
+
+    def measure_and_set_voltage(self, channel: int, next_voltage: float) -> Tuple[float, float]:
+        """
+        Measure at the present setpoint, then move to the next voltage
+
+        The measurement query and the new setpoint go out in one write, so
+        the output starts slewing to the next point while the host is still
+        handling this measurement. Useful for stepping through a sweep.
+
+        Args:
+            channel: Channel number (1 or 2)
+            next_voltage: Voltage to apply once the measurement is taken
+
+        Returns:
+            Tuple of (voltage, current) measured before the new setpoint
+        """
+        response, _ = self._send_commands([f"MEAS{channel}:VOLT:CURR?",
+                                           f"SOUR{channel}:VOLT {next_voltage}"])
+        return self._parse_voltage_and_current(response)
+
+    def measure_and_set_current(self, channel: int, next_current: float) -> Tuple[float, float]:
+        """
+        Measure at the present setpoint, then move to the next current
+
+        The measurement query and the new setpoint go out in one write, so
+        the output starts slewing to the next point while the host is still
+        handling this measurement. Useful for stepping through a sweep.
+
+        Args:
+            channel: Channel number (1 or 2)
+            next_current: Current to apply once the measurement is taken
+
+        Returns:
+            Tuple of (voltage, current) measured before the new setpoint
+        """
+        response, _ = self._send_commands([f"MEAS{channel}:VOLT:CURR?",
+                                           f"SOUR{channel}:CURR {next_current}"])
+        return self._parse_voltage_and_current(response)
+
+    def set_voltage_settled(self, channel: int, voltage: float, tol: float = 1e-3,
+                            current_rtol: float = 0.01, current_atol: float = 1e-9,
+                            timeout: float = 0.2) -> Tuple[float, float]:
+        """
+        Set voltage and wait until the output has settled
+
+        Instead of a fixed settling delay, the output is measured back-to-back
+        until the voltage is within tol of the setpoint and two successive
+        current readings agree to within max(current_rtol * |I|, current_atol).
+        The current check matters in FVMI mode, where the forced voltage gets
+        there almost at once but the current into a capacitive load is still
+        decaying. If the output never settles (compliance limit, noisy load)
+        the wait ends after timeout seconds, which matches a fixed delay of
+        the same length in the worst case.
+
+        Args:
+            channel: Channel number (1 or 2)
+            voltage: Voltage value in volts
+            tol: Voltage tolerance in volts
+            current_rtol: Relative change allowed between current readings
+            current_atol: Absolute change allowed between current readings, in amps
+            timeout: Longest time to wait for settling, in seconds
+
+        Returns:
+            Tuple of (voltage, current) from the last measurement taken
+        """
+        deadline = time.monotonic() + timeout
+        v, i = self.set_voltage_and_measure(channel, voltage)
+        while time.monotonic() < deadline:
+            previous_current = i
+            v, i = self.measure_voltage_and_current(channel)
+            if (abs(v - voltage) <= tol and
+                    abs(i - previous_current) <= max(current_rtol * abs(i), current_atol)):
+                break
+        return v, i
+
     def set_oversampling_ratio(self, channel: int, osr: int):
         """
         Set measurement oversampling ratio for specified channel
@@ -472,7 +911,8 @@ class SMU:
         """
         if range_type not in ['AUTO', 'LOW', 'HIGH']:
             raise ValueError("Range type must be 'AUTO', 'LOW', or 'HIGH'")
-        self._send_command(f"SOUR{channel}:VOLT:RANGE {range_type}")
+        self._send_setting(("voltage_range", channel), range_type,
+                           f"SOUR{channel}:VOLT:RANGE {range_type}")
 
     # Current Range Methods
     def set_autorange(self, channel: int, enabled: bool):
@@ -488,9 +928,11 @@ class SMU:
             enabled: True to enable autoranging, False to disable
         """
         if enabled:
-            self._send_command(f"CH{channel}:AUTORANGE:ENA")
+            # The device picks the range itself from here on
+            self._state.pop(("current_range", channel), None)
+            self._send_setting(("autorange", channel), True, f"CH{channel}:AUTORANGE:ENA")
         else:
-            self._send_command(f"CH{channel}:AUTORANGE:DIS")
+            self._send_setting(("autorange", channel), False, f"CH{channel}:AUTORANGE:DIS")
 
     def set_current_range(self, channel: int, range_index: int):
         """
@@ -515,7 +957,15 @@ class SMU:
         """
         if not 0 <= range_index <= 4:
             raise ValueError("Range index must be between 0 and 4")
-        self._send_command(f"CH{channel}:IRANGE {range_index}")
+        command = f"CH{channel}:IRANGE {range_index}"
+        with self._lock:
+            # The range only sticks once autorange is off, so only remember
+            # it when we know that it is
+            if self._state.get(("autorange", channel)) is False:
+                self._send_setting(("current_range", channel), range_index, command)
+            else:
+                self._state.pop(("current_range", channel), None)
+                self._send_command(command)
 
     def set_current_range_by_limit(self, channel: int, max_current: float,
                                     disable_autorange: bool = True) -> int:
@@ -542,7 +992,8 @@ class SMU:
             The selected range index (0-4)
 
         Raises:
-            ValueError: If max_current exceeds the maximum range (180 mA)
+            ValueError: If max_current is not finite or exceeds the maximum
+                        range (180 mA)
 
         Example:
             # For measurements up to 10 mA, this will select range 3 (± 15 mA)
@@ -552,16 +1003,15 @@ class SMU:
             # For measurements up to 500 µA, this will select range 2 (± 650 µA)
             selected = smu.set_current_range_by_limit(1, 500e-6)
         """
+        if not math.isfinite(max_current):
+            # NaN compares false with every limit and would select range 0
+            raise ValueError(f"max_current must be finite, got {max_current}")
         max_current = abs(max_current)
 
         # Find the smallest range that can accommodate the current
-        selected_range = None
-        for range_index in sorted(CURRENT_RANGE_LIMITS.keys()):
-            if max_current <= CURRENT_RANGE_LIMITS[range_index]:
-                selected_range = range_index
-                break
+        selected_range = bisect_left(_SORTED_RANGE_LIMITS, max_current)
 
-        if selected_range is None:
+        if selected_range >= len(_SORTED_RANGE_LIMITS):
             raise ValueError(
                 f"max_current ({max_current} A) exceeds maximum range limit "
                 f"({CURRENT_RANGE_LIMITS[4]} A = 180 mA)"
@@ -600,16 +1050,28 @@ class SMU:
         """
         if mode not in ['FIMV', 'FVMI']:
             raise ValueError("Mode must be 'FIMV' or 'FVMI'")
-        self._send_command(f"SOUR{channel}:{mode} ENA")
+        self._send_setting(("mode", channel), mode, f"SOUR{channel}:{mode} ENA")
 
     # Data Streaming Methods
     def start_streaming(self, channel: int):
-        """Start data streaming for specified channel"""
-        self._send_command(f"SOUR{channel}:DATA:STREAM ON")
+        """
+        Start data streaming for specified channel
+
+        Always sent, even if streaming was already started in this session,
+        so a stream the device stopped on its own is restarted.
+        """
+        with self._lock:
+            self._state.pop(("streaming", channel), None)
+            self._send_setting(("streaming", channel), True, f"SOUR{channel}:DATA:STREAM ON")
 
     def stop_streaming(self, channel: int):
-        """Stop data streaming for specified channel"""
-        self._send_command(f"SOUR{channel}:DATA:STREAM OFF")
+        """
+        Stop data streaming for specified channel
+
+        Does nothing if streaming on this channel was already stopped in
+        this session, so it is safe to call again from cleanup code.
+        """
+        self._send_setting(("streaming", channel), False, f"SOUR{channel}:DATA:STREAM OFF")
 
     def read_streaming_data(self) -> Tuple[int, float, float, float]:
         """
@@ -620,7 +1082,8 @@ class SMU:
         """
         if self.connection_type == ConnectionType.USB:
             # Read the data packet
-            data = self._connection.readline().decode().strip()
+            with self._lock:
+                data = self._readline_usb().decode().strip()
             try:
                 channel, timestamp, voltage, current = data.split(',')
                 return int(channel), float(timestamp), float(voltage), float(current)
@@ -629,6 +1092,52 @@ class SMU:
         else:
             raise SMUException("Streaming is only supported over USB connection")
 
+    def read_streaming_batch(self, channel: int, max_packets: int = 256
+                             ) -> Tuple[array, array, array]:
+        """
+        Read all streaming packets that have arrived, up to max_packets
+
+        One call drains whatever the serial driver has buffered instead of
+        reading a single packet, which keeps up with high sample rates. It
+        only blocks (up to the port timeout) until the first packet arrives.
+
+        Args:
+            channel: Channel to return packets for; packets from the other
+                channel are consumed and discarded
+            max_packets: Maximum number of packets to consume (at least 1)
+
+        Returns:
+            Tuple of (timestamps, voltages, currents) as array('d') columns,
+            possibly empty. numpy.frombuffer() wraps them without copying.
+        """
+        if self.connection_type != ConnectionType.USB:
+            raise SMUException("Streaming is only supported over USB connection")
+        if max_packets < 1:
+            raise ValueError("max_packets must be at least 1")
+
+        with self._lock:
+            lines = self._read_usb_lines(max_packets)
+
+        # Packets start with the channel number, so filter on the prefix
+        # before parsing anything
+        prefix = b"%d," % channel
+        lines = [line for line in lines if line.lstrip().startswith(prefix)]
+        if not lines:
+            # Timed out, or every packet was for the other channel
+            return array('d'), array('d'), array('d')
+
+        # Parse column-wise: split every packet in one pass, then convert
+        # each field with a strided slice rather than unpacking per packet
+        fields = b','.join(lines).split(b',')
+        try:
+            if len(fields) != 4 * len(lines):
+                raise ValueError
+            return (array('d', map(float, fields[1::4])), array('d', map(float, fields[2::4])),
+                    array('d', map(float, fields[3::4])))
+        except ValueError:
+            bad = next((line for line in lines if line.count(b',') != 3), lines)
+            raise SMUException(f"Failed to parse streaming data: {bad!r}")
+
     def set_sample_rate(self, channel: int, rate: float):
         """
         Set sample rate for specified channel
@@ -694,6 +1203,8 @@ class SMU:
         Raises:
             SMUException: If 4-wire mode cannot be enabled (streaming/sweep active)
         """
+        # 4-wire mode reconfigures CH2 (and restores it on disable)
+        self._state.clear()
         response = self._send_command("SYST:4WIR ENA")
         if response.startswith("ERROR"):
             raise SMUException(response)
@@ -707,6 +1218,7 @@ class SMU:
         - Both channels can be controlled independently
         - Measurements return values from the measured channel only
         """
+        self._state.clear()
         response = self._send_command("SYST:4WIR DIS")
         if response.startswith("ERROR"):
             raise SMUException(response)
@@ -730,7 +1242,7 @@ class SMU:
             List of available networks
         """
         response = self._send_command("SYST:WIFI:SCAN?")
-        return json.loads(response)
+        return _json_loads(response)
 
     def get_wifi_status(self) -> WifiStatus:
         """
@@ -740,7 +1252,7 @@ class SMU:
             WifiStatus object with connection details
         """
         response = self._send_command("SYST:WIFI?")
-        status_dict = json.loads(response)
+        status_dict = _json_loads(response)
         return WifiStatus(
             connected=status_dict.get('connected', False),
             ssid=status_dict.get('ssid', ''),
@@ -825,12 +1337,12 @@ class SMU:
         
         # Configure auto enable/disable
         if auto_enable:
-            self._send_command(f"SOUR{channel}:SWEEP:AUTO:ENA")
+            self.enable_sweep_auto_output(channel)
         else:
-            self._send_command(f"SOUR{channel}:SWEEP:AUTO:DIS")
+            self.disable_sweep_auto_output(channel)
         
         # Set output format
-        self._send_command(f"SOUR{channel}:SWEEP:FORMAT {output_format}")
+        self.set_sweep_output_format(channel, output_format)
 
     def set_sweep_start_voltage(self, channel: int, voltage: float):
         """Set sweep start voltage"""
@@ -854,30 +1366,41 @@ class SMU:
 
     def enable_sweep_auto_output(self, channel: int):
         """Enable automatic output control during sweep"""
-        self._send_command(f"SOUR{channel}:SWEEP:AUTO:ENA")
+        self._send_setting(("sweep_auto_output", channel), True,
+                           f"SOUR{channel}:SWEEP:AUTO:ENA")
+        # The getter reads back what the device reports, not what was sent
+        self._state.pop(("sweep_auto_output?", channel), None)
 
     def disable_sweep_auto_output(self, channel: int):
         """Disable automatic output control during sweep"""
-        self._send_command(f"SOUR{channel}:SWEEP:AUTO:DIS")
+        self._send_setting(("sweep_auto_output", channel), False,
+                           f"SOUR{channel}:SWEEP:AUTO:DIS")
+        self._state.pop(("sweep_auto_output?", channel), None)
 
     def get_sweep_auto_output_status(self, channel: int) -> bool:
         """Get sweep auto output control status"""
-        response = self._send_command(f"SOUR{channel}:SWEEP:AUTO?")
-        return response == "1"
+        return self._query_setting(("sweep_auto_output?", channel),
+                                   f"SOUR{channel}:SWEEP:AUTO?",
+                                   lambda response: response == "1")
 
     def set_sweep_output_format(self, channel: int, output_format: str):
         """Set sweep output format ('CSV' or 'JSON')"""
         if output_format not in ["CSV", "JSON"]:
             raise ValueError("Output format must be 'CSV' or 'JSON'")
-        self._send_command(f"SOUR{channel}:SWEEP:FORMAT {output_format}")
+        self._send_setting(("sweep_format", channel), output_format,
+                           f"SOUR{channel}:SWEEP:FORMAT {output_format}")
+        self._state.pop(("sweep_format?", channel), None)
 
     def get_sweep_output_format(self, channel: int) -> str:
         """Get current sweep output format"""
-        response = self._send_command(f"SOUR{channel}:SWEEP:FORMAT?")
-        return response.strip('"')
+        return self._query_setting(("sweep_format?", channel),
+                                   f"SOUR{channel}:SWEEP:FORMAT?",
+                                   lambda response: response.strip('"'))
 
     def execute_sweep(self, channel: int):
         """Execute the configured I-V sweep"""
+        # The sweep drives the channel as a voltage source
+        self._state.pop(("mode", channel), None)
         self._send_command(f"SOUR{channel}:SWEEP:EXECUTE")
 
     def abort_sweep(self, channel: int):
@@ -904,16 +1427,75 @@ class SMU:
             estimated_remaining_ms=int(parts[4])
         )
 
+    def wait_for_sweep(self, channel: int,
+                       progress_callback: Optional[Callable[[SweepStatus], None]] = None,
+                       timeout: Optional[float] = None) -> SweepStatus:
+        """
+        Wait until the sweep on a channel is no longer running
+
+        Rather than polling at a fixed rate, the delay between status queries
+        is a quarter of the device's estimated remaining time, kept between
+        50 ms and 2 s - long sweeps are polled rarely, and polling tightens
+        as the sweep nears the end.
+
+        "IDLE" straight after execute_sweep() can mean the sweep hasn't
+        started yet, so it only counts as finished once "RUNNING" has been
+        seen or after a one second grace period.
+
+        Args:
+            channel: Channel number (1 or 2)
+            progress_callback: Called with the SweepStatus after each poll
+                               while the sweep is running
+            timeout: Maximum time to wait in seconds (None waits indefinitely)
+
+        Returns:
+            Final SweepStatus ("COMPLETED", "ABORTED" or "IDLE")
+
+        Raises:
+            SMUException: If the timeout expires before the sweep finishes
+        """
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        seen_running = False
+        while True:
+            status = self.get_sweep_status(channel)
+            if status.status in ("COMPLETED", "ABORTED"):
+                return status
+            if status.status == "IDLE":
+                if seen_running or time.monotonic() - start >= 1.0:
+                    return status
+            elif status.status == "RUNNING":
+                seen_running = True
+
+            if progress_callback is not None and status.status == "RUNNING":
+                progress_callback(status)
+
+            delay = min(max(status.estimated_remaining_ms / 1000 * 0.25, 0.05), 2.0)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SMUException(f"Timed out waiting for sweep on channel {channel}")
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+    @staticmethod
+    def _print_sweep_progress(status: SweepStatus) -> None:
+        """Progress printer used by run_iv_sweep(monitor_progress=True)"""
+        progress = (status.current_point / status.total_points) * 100
+        remaining_sec = status.estimated_remaining_ms / 1000
+        print(f"Progress: {progress:.1f}% ({status.current_point}/{status.total_points}), "
+              f"~{remaining_sec:.1f}s remaining")
+
     def get_sweep_data_raw(self, channel: int) -> str:
         """Get raw sweep data in configured format"""
         return self._send_command(f"SOUR{channel}:SWEEP:DATA?")
 
-    def get_sweep_data_csv(self, channel: int) -> List[SweepDataPoint]:
+    def get_sweep_data_csv(self, channel: int) -> SweepData:
         """
-        Get sweep data in CSV format parsed into SweepDataPoint objects
+        Get sweep data in CSV format parsed into a SweepData sequence
         
         Returns:
-            List of SweepDataPoint objects
+            SweepData sequence of SweepDataPoint objects
         """
         # Ensure CSV format is set
         self.set_sweep_output_format(channel, "CSV")
@@ -921,19 +1503,8 @@ class SMU:
         # Get raw data
         raw_data = self.get_sweep_data_raw(channel)
         
-        # Parse CSV data
-        data_points = []
-        for line in raw_data.strip().split('\n'):
-            if line.strip():
-                parts = line.split(',')
-                if len(parts) >= 3:
-                    data_points.append(SweepDataPoint(
-                        timestamp=int(float(parts[0])),
-                        voltage=float(parts[1]),
-                        current=float(parts[2])
-                    ))
-        
-        return data_points
+        # Parse CSV data column-wise
+        return SweepData.from_csv(raw_data)
 
     def get_sweep_data_json(self, channel: int) -> SweepResult:
         """
@@ -949,7 +1520,7 @@ class SMU:
         raw_data = self.get_sweep_data_raw(channel)
         
         # Parse JSON data
-        json_data = json.loads(raw_data)
+        json_data = _json_loads(raw_data)
         
         # Create config object
         config_data = json_data['sweep_config']
@@ -962,20 +1533,14 @@ class SMU:
             auto_enable=config_data['auto_enable']
         )
         
-        # Create data points
-        data_points = []
-        for point in json_data['data']:
-            data_points.append(SweepDataPoint(
-                timestamp=int(point['t']),
-                voltage=float(point['v']),
-                current=float(point['i'])
-            ))
+        # Fill the data columns
+        data = SweepData.from_json(json_data['data'])
         
-        return SweepResult(config=config, data=data_points)
+        return SweepResult(config=config, data=data)
 
     def run_iv_sweep(self, channel: int, start_voltage: float, end_voltage: float,
                     points: int, dwell_ms: int = 50, auto_enable: bool = True,
-                    output_format: str = "JSON", monitor_progress: bool = False) -> Union[List[SweepDataPoint], SweepResult]:
+                    output_format: str = "JSON", monitor_progress: bool = False) -> Union[SweepData, SweepResult]:
         """
         Complete I-V sweep operation: configure, execute, and retrieve data
         
@@ -990,7 +1555,10 @@ class SMU:
             monitor_progress: Print progress updates during sweep
             
         Returns:
-            List[SweepDataPoint] for CSV format or SweepResult for JSON format
+            SweepData for CSV format or SweepResult for JSON format
+
+        Raises:
+            SMUException: If the sweep was aborted or never ran
         """
         # Configure sweep
         self.configure_iv_sweep(channel, start_voltage, end_voltage, points, 
@@ -1003,30 +1571,18 @@ class SMU:
         if monitor_progress:
             print(f"Starting I-V sweep: {start_voltage}V to {end_voltage}V, {points} points")
             
-            while True:
-                status = self.get_sweep_status(channel)
-                
-                if status.status == "RUNNING":
-                    progress = (status.current_point / status.total_points) * 100
-                    remaining_sec = status.estimated_remaining_ms / 1000
-                    print(f"Progress: {progress:.1f}% ({status.current_point}/{status.total_points}), "
-                          f"~{remaining_sec:.1f}s remaining")
-                    time.sleep(1)
-                elif status.status == "COMPLETED":
-                    print("Sweep completed successfully!")
-                    break
-                elif status.status == "ABORTED":
-                    raise SMUException("Sweep was aborted")
-                else:
-                    # For other statuses, wait and check again
-                    time.sleep(0.5)
+            status = self.wait_for_sweep(channel, progress_callback=self._print_sweep_progress)
         else:
             # Wait for completion without monitoring
-            while True:
-                status = self.get_sweep_status(channel)
-                if status.status in ["COMPLETED", "ABORTED", "IDLE"]:
-                    break
-                time.sleep(0.5)
+            status = self.wait_for_sweep(channel)
+        
+        if status.status == "ABORTED":
+            raise SMUException("Sweep was aborted")
+        if status.status != "COMPLETED":
+            # Still IDLE after the grace period - the sweep never started
+            raise SMUException(f"Sweep on channel {channel} did not run (status {status.status})")
+        if monitor_progress:
+            print("Sweep completed successfully!")
         
         # Retrieve and return data
         if output_format == "CSV":
@@ -1036,6 +1592,7 @@ class SMU:
 
     def close(self):
         """Close the connection"""
+        self._state.clear()
         if self._connection:
             self._connection.close()
 
@@ -1,13 +1,15 @@
 import pytest
-from minismu_py import SMU, ConnectionType, SMUException
+from minismu_py import SMU, ConnectionType, SMUException, SweepData, SweepDataPoint, SweepResult, SweepStatus
 from unittest.mock import Mock, patch
+from dataclasses import asdict, replace
 
 @pytest.fixture
 def mock_serial():
     with patch('serial.Serial') as mock:
         # Configure mock to return specific responses
         mock_instance = Mock()
-        mock_instance.readline.return_value = b"OK\n"
+        mock_instance.in_waiting = 0
+        mock_instance.read.return_value = b"OK\n"
         mock.return_value = mock_instance
         yield mock_instance
 
@@ -15,20 +17,253 @@ def test_smu_initialization(mock_serial):
     smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
     assert smu.connection_type == ConnectionType.USB
 
+def test_low_latency_enabled_by_default(mock_serial):
+    SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    mock_serial.set_low_latency_mode.assert_called_once_with(True)
+
+def test_low_latency_unsupported_is_ignored(mock_serial):
+    mock_serial.set_low_latency_mode.side_effect = NotImplementedError
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert smu.connection_type == ConnectionType.USB
+
+def test_low_latency_can_be_disabled(mock_serial):
+    SMU(ConnectionType.USB, port="/dev/ttyACM0", low_latency=False)
+    mock_serial.set_low_latency_mode.assert_not_called()
+
+def test_usb_reads_capped_at_chunk_size(mock_serial):
+    mock_serial.in_waiting = 100000
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0", usb_chunk_bytes=4096)
+    mock_serial.set_buffer_size.assert_called_once_with(rx_size=4096, tx_size=4096)
+    smu.get_identity()
+    mock_serial.read.assert_called_with(4096)
+    with pytest.raises(ValueError):
+        SMU(ConnectionType.USB, port="/dev/ttyACM0", usb_chunk_bytes=1024)
+
 def test_get_identity(mock_serial):
-    mock_serial.readline.return_value = b"Undalogic Inc,MS01-p9,12345,v1.0.0\n"
+    mock_serial.read.return_value = b"Undalogic Inc,MS01-p9,12345,v1.0.0\n"
     smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
     identity = smu.get_identity()
     assert "Undalogic" in identity
 
 def test_measure_voltage_and_current(mock_serial):
-    mock_serial.readline.return_value = b"3.301,-0.0015\n"
+    mock_serial.read.return_value = b"3.301,-0.0015\n"
     smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
     voltage, current = smu.measure_voltage_and_current(1)
     assert isinstance(voltage, float)
     assert isinstance(current, float)
 
+def test_usb_reads_split_buffered_lines(mock_serial):
+    mock_serial.read.side_effect = [b"3.301,-0.0015\nOK", b"\n"]
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert smu.measure_voltage_and_current(1) == (3.301, -0.0015)
+    smu.set_voltage(1, 1.0)
+    assert mock_serial.read.call_count == 2
+
+def test_set_voltage_and_measure_single_write(mock_serial):
+    mock_serial.read.return_value = b"OK\n0.5,0.001\n"
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert smu.set_voltage_and_measure(1, 0.5) == (0.5, 0.001)
+    mock_serial.write.assert_called_once_with(b"SOUR1:VOLT 0.5\nMEAS1:VOLT:CURR?\n")
+
+def test_set_voltage_settled_waits_for_current_to_settle(mock_serial):
+    # Voltage is on target at once; the current keeps decaying for a while
+    mock_serial.read.side_effect = [b"OK\n", b"1.0,0.010\n", b"1.0,0.004\n",
+                                    b"1.0,0.0021\n", b"1.0,0.00209\n"]
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert smu.set_voltage_settled(1, 1.0, timeout=10) == (1.0, 0.00209)
+    assert mock_serial.write.call_count == 4
+
+def test_measure_and_set_current_returns_measurement(mock_serial):
+    mock_serial.read.return_value = b"1.2,0.004\nOK\n"
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert smu.measure_and_set_current(1, 0.005) == (1.2, 0.004)
+    mock_serial.write.assert_called_once_with(b"MEAS1:VOLT:CURR?\nSOUR1:CURR 0.005\n")
+
+def test_measure_channels_pipelines_queries(mock_serial):
+    mock_serial.read.return_value = b"1.0,0.001\n2.0,0.002\n"
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert smu.measure_channels([1, 2]) == [(1.0, 0.001), (2.0, 0.002)]
+    mock_serial.write.assert_called_once_with(b"MEAS1:VOLT:CURR?\nMEAS2:VOLT:CURR?\n")
+
+def test_concurrent_commands_are_not_interleaved(mock_serial):
+    from concurrent.futures import ThreadPoolExecutor
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    in_flight = []
+
+    def write(data):
+        in_flight.append(data)
+        assert len(in_flight) == 1
+        return len(data)
+
+    def read(size):
+        in_flight.pop()
+        return b"1.0,0.001\n"
+
+    mock_serial.write.side_effect = write
+    mock_serial.read.side_effect = read
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(smu.measure_voltage_and_current, [1, 2] * 20))
+    assert results == [(1.0, 0.001)] * 40
+
+def test_read_streaming_batch_filters_channel(mock_serial):
+    mock_serial.read.side_effect = [b"1,0.0,1.0,0.1\n2,0.0,2.0,0.2\n1,0.01,1.1,",
+                                    b"0.11\n1,0.02,"]
+    mock_serial.in_waiting = 6
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    timestamps, voltages, currents = smu.read_streaming_batch(channel=1)
+    assert list(timestamps) == [0.0, 0.01]
+    assert list(voltages) == [1.0, 1.1]
+    assert list(currents) == [0.1, 0.11]
+    assert smu._rx_buffer == b"1,0.02,"
+
+def test_read_streaming_batch_other_channel_only_is_empty(mock_serial):
+    mock_serial.read.side_effect = [b"2,0.0,2.0,0.2\n2,0.01,2.1,0.21\n"]
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert [len(column) for column in smu.read_streaming_batch(channel=1)] == [0, 0, 0]
+
+def test_read_streaming_batch_timeout_is_empty(mock_serial):
+    mock_serial.read.return_value = b""
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert [len(column) for column in smu.read_streaming_batch(channel=1)] == [0, 0, 0]
+
+def test_read_streaming_batch_rejects_empty_batch(mock_serial):
+    mock_serial.read.return_value = b"1,0.0,1.0,0.1\n"
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    with pytest.raises(ValueError):
+        smu.read_streaming_batch(channel=1, max_packets=0)
+    mock_serial.read.assert_not_called()
+
+def test_repeated_settings_are_not_resent(mock_serial):
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    smu.set_mode(1, "FVMI")
+    smu.set_mode(1, "FVMI")
+    smu.set_autorange(1, False)
+    smu.set_autorange(1, False)
+    assert mock_serial.write.call_count == 2
+    smu.reset()
+    smu.set_mode(1, "FVMI")
+    assert mock_serial.write.call_count == 4
+
+def test_identity_and_sweep_settings_are_memoized(mock_serial):
+    mock_serial.read.return_value = b"Undalogic Inc,MS01-p9,12345,v1.0.0\n"
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert smu.get_identity() == smu.get_identity()
+    assert mock_serial.write.call_count == 1
+    mock_serial.read.return_value = b"OK\n"
+    smu.set_sweep_output_format(1, "JSON")
+    smu.set_sweep_output_format(1, "JSON")
+    assert mock_serial.write.call_count == 2
+    # A set must not be echoed back: the getter asks the device once
+    mock_serial.read.return_value = b'"CSV"\n'
+    assert smu.get_sweep_output_format(1) == "CSV"
+    assert smu.get_sweep_output_format(1) == "CSV"
+    assert mock_serial.write.call_count == 3
+
+def test_sweep_json_with_nan_is_parsed(mock_serial):
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    payload = (b'{"sweep_config": {"channel": 1, "start_voltage": 0, "end_voltage": 1,'
+               b' "points": 2, "dwell_ms": 50, "auto_enable": true},'
+               b' "data": [{"t": 1, "v": 0.0, "i": NaN},'
+               b' {"t": 2, "v": 1.0, "i": 0.5}]}\n')
+    mock_serial.read.side_effect = [b"OK\n", payload]
+    result = smu.get_sweep_data_json(1)
+    assert len(result.data) == 2
+    assert result.currents[0] != result.currents[0]
+    assert result.currents[1] == 0.5
+
+def test_unacknowledged_setting_is_resent(mock_serial):
+    mock_serial.read.return_value = b""
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    smu.set_mode(1, "FIMV")
+    smu.set_mode(1, "FIMV")
+    assert mock_serial.write.call_count == 2
+
+def test_stop_streaming_is_idempotent(mock_serial):
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    smu.start_streaming(1)
+    smu.stop_streaming(1)
+    smu.stop_streaming(1)
+    assert mock_serial.write.call_count == 2
+
+def test_start_streaming_is_always_sent(mock_serial):
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    smu.start_streaming(1)
+    smu.start_streaming(1)
+    assert mock_serial.write.call_count == 2
+    smu.stop_streaming(1)
+    assert mock_serial.write.call_count == 3
+
+def test_current_range_resent_after_disabling_autorange(mock_serial):
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    smu.set_current_range(1, 2)  # Autorange state unknown - ignored by device
+    smu.set_autorange(1, False)
+    smu.set_current_range(1, 2)
+    smu.set_current_range(1, 2)
+    assert [c.args[0] for c in mock_serial.write.call_args_list] == [
+        b"CH1:IRANGE 2\n", b"CH1:AUTORANGE:DIS\n", b"CH1:IRANGE 2\n"]
+
+def test_set_current_range_by_limit_selects_smallest_range(mock_serial):
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    assert smu.set_current_range_by_limit(1, 10e-3) == 3
+    assert smu.set_current_range_by_limit(1, -20e-6) == 1
+    assert smu.set_current_range_by_limit(1, 15e-3) == 3
+    with pytest.raises(ValueError):
+        smu.set_current_range_by_limit(1, 0.2)
+    for limit in (float("nan"), float("inf")):
+        with pytest.raises(ValueError):
+            smu.set_current_range_by_limit(1, limit)
+
+def test_wait_for_sweep_backs_off_with_remaining_time(mock_serial):
+    mock_serial.read.side_effect = [b"RUNNING,1,10,100,4000\n",
+                                    b"RUNNING,9,10,900,100\n",
+                                    b"COMPLETED,10,10,1000,0\n"]
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    with patch('minismu_py.smu.time.sleep') as sleep:
+        status = smu.wait_for_sweep(1)
+    assert status.status == "COMPLETED"
+    assert [c.args[0] for c in sleep.call_args_list] == [1.0, 0.05]
+
+def test_wait_for_sweep_idle_before_start_keeps_waiting(mock_serial):
+    mock_serial.read.side_effect = [b"IDLE,0,10,0,0\n",
+                                    b"RUNNING,5,10,500,500\n",
+                                    b"IDLE,10,10,1000,0\n"]
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    with patch('minismu_py.smu.time.sleep'):
+        status = smu.wait_for_sweep(1)
+    assert status.current_point == 10
+    assert mock_serial.write.call_count == 3
+
 def test_invalid_voltage_range():
     smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
     with pytest.raises(ValueError):
         smu.set_voltage_range(1, "INVALID")
+
+def test_sweep_data_csv_parsed_column_wise():
+    data = SweepData.from_csv("0,0.0,1e-6\n50,0.5,2e-6\n\n100.0,1.0,3e-6\n")
+    assert len(data) == 3
+    assert list(data.timestamps) == [0, 50, 100]
+    assert list(data.voltages) == [0.0, 0.5, 1.0]
+    assert data[1] == SweepDataPoint(timestamp=50, voltage=0.5, current=2e-6)
+    assert [p.current for p in data[1:]] == [2e-6, 3e-6]
+
+def test_sweep_result_exposes_columns():
+    data = SweepData([0, 50], [0.0, 0.5], [1e-6, 2e-6])
+    result = SweepResult(config=None, data=data)
+    assert result.voltages is data.voltages
+    assert list(result.currents) == [1e-6, 2e-6]
+    assert not hasattr(data[0], '__dict__')
+
+def test_sweep_data_to_list_round_trips_through_asdict():
+    data = SweepData([0], [0.5], [1e-6])
+    result = SweepResult(config=None, data=data)
+    plain = asdict(replace(result, data=data.to_list()))
+    assert plain["data"] == [{"timestamp": 0, "voltage": 0.5, "current": 1e-6}]
+
+def test_run_iv_sweep_that_never_ran_raises(mock_serial):
+    smu = SMU(ConnectionType.USB, port="/dev/ttyACM0")
+    idle = SweepStatus(status="IDLE", current_point=0, total_points=10,
+                       elapsed_ms=0, estimated_remaining_ms=0)
+    with patch.object(SMU, "wait_for_sweep", return_value=idle):
+        for monitor_progress in (True, False):
+            with pytest.raises(SMUException):
+                smu.run_iv_sweep(1, 0.0, 1.0, 10, monitor_progress=monitor_progress)